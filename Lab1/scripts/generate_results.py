@@ -1,17 +1,96 @@
-import csv
+import argparse
+import atexit
+import ctypes
+import math
+import multiprocessing
 import os
+import platform
+import shutil
+import subprocess
 import sys
-import time
+import tempfile
+import timeit
+from concurrent.futures import ProcessPoolExecutor
 
 import matplotlib
 
 matplotlib.use("Agg")
 import matplotlib.pyplot as plt
 
+try:
+    import gmpy2
+except ImportError:
+    gmpy2 = None
+
+# PyPy's tracing JIT already compiles the pure-Python loops, and Numba
+# does not run there
+if platform.python_implementation() == "PyPy":
+    njit = None
+else:
+    try:
+        # numpy is only needed by the Numba kernels, and numba requires it
+        import numpy as np
+        from numba import njit
+    except ImportError:
+        njit = None
+
 SMALL_INPUTS = [5, 7, 10, 12, 15, 17, 20, 22, 25, 27, 30, 32, 35, 37, 40, 42, 45]
 LARGE_INPUTS = [501, 631, 794, 1000, 1259, 1585, 1995, 2512, 3162, 3981, 5012, 6310, 7943, 10000, 12589, 15849]
 INPUT_SIZES = SMALL_INPUTS + LARGE_INPUTS
-REPEATS = 3
+
+FIB_C_SOURCE = """\
+#include <stdint.h>
+#include <stdlib.h>
+#include <string.h>
+
+long long fib(int n) {
+    /* stop at F(n) so n = 92 never forms the overflowing F(93) */
+    if (n == 0)
+        return 0;
+    long long a = 0, b = 1, t;
+    for (int i = 1; i < n; i++) {
+        t = a + b;
+        a = b;
+        b = t;
+    }
+    return b;
+}
+
+/* same loop on little-endian uint64 limbs with an explicit carry; the two
+   buffers swap roles each step and F(n) is left in out */
+int fib_limbs(int n, uint64_t *out, int limbs) {
+    uint64_t *a = out, *b = calloc(limbs, sizeof(uint64_t)), *t;
+    if (b == NULL)
+        return -1;
+    memset(a, 0, limbs * sizeof(uint64_t));
+    b[0] = 1;
+    int used = 1;
+    for (int k = 0; k < n; k++) {
+        uint64_t carry = 0;
+        for (int i = 0; i < used; i++) {
+            uint64_t s = a[i] + b[i];
+            uint64_t c = s < a[i];
+            a[i] = s + carry;
+            carry = c | (a[i] < s);
+        }
+        if (carry)
+            a[used++] = carry;
+        t = a;
+        a = b;
+        b = t;
+    }
+    if (a != out) {
+        memcpy(out, a, limbs * sizeof(uint64_t));
+        free(a);
+    } else {
+        free(b);
+    }
+    return 0;
+}
+"""
+
+# shared libraries built by build_c_fib() at startup
+_libfib = None
 
 
 def fib_iterative(n):
@@ -21,6 +100,60 @@ def fib_iterative(n):
     return a
 
 
+if njit is not None:
+    @njit(cache=True)
+    def _fib_it_nb(n):
+        a = 0
+        b = 1
+        for _ in range(n):
+            a, b = b, a + b
+        return a
+
+    @njit(cache=True)
+    def _fib_limbs_nb(n, limbs):
+        # little-endian uint64 limbs, added in place with an explicit carry;
+        # the two buffers swap roles instead of allocating a new number
+        a = np.zeros(limbs, dtype=np.uint64)
+        b = np.zeros(limbs, dtype=np.uint64)
+        b[0] = 1
+        used = 1
+        for _ in range(n):
+            carry = np.uint64(0)
+            for i in range(used):
+                s = a[i] + b[i]
+                c = s < a[i]
+                a[i] = s + carry
+                carry = np.uint64(c | (a[i] < s))
+            if carry:
+                a[used] = carry
+                used += 1
+            a, b = b, a
+        return a
+
+    # compile once at import so the timing loop never pays for it
+    _fib_it_nb(1)
+    _fib_limbs_nb(93, 3)
+
+
+def fib_iterative_nb(n):
+    # F(93) no longer fits in an int64 accumulator, so switch to limb buffers
+    if n > 92:
+        limbs = math.ceil(n * math.log2((1 + math.sqrt(5)) / 2) / 64) + 2
+        return int.from_bytes(_fib_limbs_nb(n, limbs).astype("<u8").tobytes(), "little")
+    return int(_fib_it_nb(n))
+
+
+def fib_iterative_c(n):
+    if n <= 92:
+        return _libfib.fib(n)
+    # past F(92) the C loop works on uint64 limbs instead of one long long
+    limbs = math.ceil(n * math.log2((1 + math.sqrt(5)) / 2) / 64) + 2
+    buf = (ctypes.c_uint64 * limbs)()
+    if _libfib.fib_limbs(n, buf, limbs) != 0:
+        raise MemoryError("fib_limbs could not allocate its scratch buffer")
+    return int.from_bytes(bytes(buf), sys.byteorder)
+
+
 def fib_memoized(n):
     if n < 2:
         return n
@@ -47,32 +180,40 @@ def fib_memoized(n):
 
 
 def fib_fast_doubling(n):
-    def solve(k):
-        if k == 0:
-            return (0, 1)
-        a, b = solve(k // 2)
+    # walk the bits of n from MSB to LSB, keeping (F(k), F(k+1)) in locals
+    a, b = 0, 1
+    for bit in bin(n)[2:]:
         c = a * (2 * b - a)
         d = a * a + b * b
-        if k % 2 == 0:
-            return (c, d)
-        return (d, c + d)
-
-    return solve(n)[0]
+        if bit == "0":
+            a, b = c, d
+        else:
+            a, b = d, c + d
+    return a
 
 
-def fib_binomial(n):
+def _binomial_sum(n, num):
     if n == 0:
         return 0
     max_k = (n - 1) // 2
-    term = 1
-    total = 0
+    term = num(1)
+    total = num(0)
     for k in range(max_k + 1):
         total += term
         if k < max_k:
             numerator = (n - 2 * k - 1) * (n - 2 * k - 2)
             denominator = (k + 1) * (n - k - 1)
             term = term * numerator // denominator
-    return total
+    return int(total)
+
+
+def fib_binomial(n):
+    return _binomial_sum(n, int)
+
+
+def fib_binomial_mpz(n):
+    # same recurrence, with the term updates running on GMP integers
+    return _binomial_sum(n, gmpy2.mpz)
 
 
 def fib_matrix_fast(n):
@@ -100,6 +241,10 @@ def fib_matrix_fast(n):
     return mat_pow(n)[0][1]
 
 
+def fib_gmpy2(n):
+    return int(gmpy2.fib(n))
+
+
 ALGORITHMS = {
     "iterative": ("Iterative Linear", fib_iterative),
     "memoized": ("Memoized Recursion", fib_memoized),
@@ -108,16 +253,120 @@ ALGORITHMS = {
     "matrix_fast": ("Fast Matrix Exponentiation", fib_matrix_fast),
 }
 
+if gmpy2 is not None:
+    ALGORITHMS["binomial_mpz"] = ("Binomial Sum (gmpy2.mpz)", fib_binomial_mpz)
+    ALGORITHMS["gmpy2"] = ("GMP mpz_fib_ui", fib_gmpy2)
+
+if njit is not None:
+    ALGORITHMS["iterative_nb"] = ("Iterative Linear (Numba)", fib_iterative_nb)
+
+# ground truth for every swept n, computed once at import
+if gmpy2 is not None:
+    GROUND = {n: int(gmpy2.fib(n)) for n in INPUT_SIZES}
+else:
+    GROUND = {n: fib_fast_doubling(n) for n in INPUT_SIZES}
+
+# compiled variants are checked against GROUND; the Python references are not
+VALIDATED = {"iterative_nb", "iterative_c"}
+
+
+def time_run(fn, n, check=False):
+    # the untimed call doubles as warmup and, for checked variants, as the
+    # correctness gate; the timed loops below never compare results
+    value = fn(n)
+    if check and value != GROUND[n]:
+        raise ValueError(f"{fn.__name__} returned a wrong value for n={n}")
+    loops, total = timeit.Timer(lambda: fn(n)).autorange()
+    return total / loops
+
 
-def time_run(fn, n):
-    best = None
-    for _ in range(REPEATS):
-        start = time.perf_counter()
-        fn(n)
-        elapsed = time.perf_counter() - start
-        if best is None or elapsed < best:
-            best = elapsed
-    return best
+def parse_args():
+    parser = argparse.ArgumentParser(description="Fibonacci Lab: empirical analysis")
+    parser.add_argument("--jobs", type=int, default=1,
+                        help="worker processes for the algorithm x input sweep, "
+                             "capped at the CPUs this process may run on; parallel "
+                             "timings share caches and memory bandwidth and are not "
+                             "comparable with serial ones")
+    return parser.parse_args()
+
+
+def _compile_shared(build_dir, name, source):
+    src = os.path.join(build_dir, f"{name}.c")
+    out = os.path.join(build_dir, f"lib{name}.so")
+    with open(src, "w") as handle:
+        handle.write(source)
+    subprocess.run(["gcc", "-O3", "-shared", "-fPIC", src, "-o", out],
+                   check=True, capture_output=True)
+
+
+def build_c_fib():
+    if shutil.which("gcc") is None:
+        print("gcc not available; skipping C Fibonacci.")
+        return None
+
+    build_dir = tempfile.mkdtemp(prefix="fib_c_")
+    atexit.register(shutil.rmtree, build_dir, ignore_errors=True)
+    try:
+        _compile_shared(build_dir, "fib", FIB_C_SOURCE)
+    except (OSError, subprocess.CalledProcessError):
+        print("C Fibonacci failed to compile; skipping.")
+        return None
+
+    load_c_fib(build_dir)
+    return build_dir
+
+
+def load_c_fib(build_dir):
+    global _libfib
+    _libfib = ctypes.CDLL(os.path.join(build_dir, "libfib.so"))
+    _libfib.fib.argtypes = [ctypes.c_int]
+    _libfib.fib.restype = ctypes.c_longlong
+    _libfib.fib_limbs.argtypes = [ctypes.c_int, ctypes.POINTER(ctypes.c_uint64), ctypes.c_int]
+    _libfib.fib_limbs.restype = ctypes.c_int
+
+    ALGORITHMS["iterative_c"] = ("Iterative Linear (C)", fib_iterative_c)
+
+
+def _available_cpus():
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def _pin_to_core(cpu):
+    if hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, {cpu})
+
+
+def _init_worker(cpus, build_dir):
+    _pin_to_core(cpus.get())
+    if build_dir is not None:
+        load_c_fib(build_dir)
+
+
+def _run_task(key, n):
+    return time_run(ALGORITHMS[key][1], n, check=key in VALIDATED)
+
+
+def run_sweep(jobs, build_dir):
+    tasks = [(key, n) for key in ALGORITHMS for n in INPUT_SIZES]
+    available = _available_cpus()
+    if jobs > len(available):
+        # workers sharing a CPU would time-share it while measuring
+        print(f"--jobs {jobs} exceeds the {len(available)} available CPUs; "
+              f"using {len(available)}.")
+        jobs = len(available)
+    if jobs <= 1:
+        _pin_to_core(available[0])
+        return [_run_task(key, n) for key, n in tasks]
+
+    cpus = multiprocessing.Queue()
+    for cpu in available[:jobs]:
+        cpus.put(cpu)
+
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker,
+                             initargs=(cpus, build_dir)) as pool:
+        return list(pool.map(_run_task, *zip(*tasks)))
 
 
 def ensure_dirs():
@@ -127,75 +376,87 @@ def ensure_dirs():
 
 def write_csv(name, rows):
     path = os.path.join("results", f"{name}.csv")
+    # same \r\n rows csv.writer produced, built up front and written once
+    lines = ["n,time_s", *(f"{n},{t}" for n, t in rows)]
     with open(path, "w", newline="") as handle:
-        writer = csv.writer(handle)
-        writer.writerow(["n", "time_s"])
-        writer.writerows(rows)
+        handle.write("\r\n".join(lines) + "\r\n")
 
 
 def write_table(name, rows):
     path = os.path.join("results", f"{name}_table.tex")
+    parts = [
+        "\\begin{table}[H]\n",
+        "\\centering\n",
+        "\\caption{" + name.replace("_", " ").title() + " Results}\n",
+        "\\begin{tabular}{rr}\n",
+        "\\toprule\n",
+        "n & time (s)\\\\\n",
+        "\\midrule\n",
+        *(f"{n} & {t:.6f}\\\\\n" for n, t in rows),
+        "\\bottomrule\n",
+        "\\end{tabular}\n",
+        "\\end{table}\n",
+    ]
     with open(path, "w") as handle:
-        handle.write("\\begin{table}[H]\n")
-        handle.write("\\centering\n")
-        handle.write("\\caption{" + name.replace("_", " ").title() + " Results}\n")
-        handle.write("\\begin{tabular}{rr}\n")
-        handle.write("\\toprule\n")
-        handle.write("n & time (s)\\\\\n")
-        handle.write("\\midrule\n")
-        for n, t in rows:
-            handle.write(f"{n} & {t:.6f}\\\\\n")
-        handle.write("\\bottomrule\n")
-        handle.write("\\end{tabular}\n")
-        handle.write("\\end{table}\n")
-
-
-def plot_single(name, title, rows):
+        handle.write("".join(parts))
+
+
+def plot_single(fig, ax, name, title, rows):
     ns = [n for n, _ in rows]
     ts = [t for _, t in rows]
-    plt.figure(figsize=(7, 4))
-    plt.plot(ns, ts, marker="o")
-    plt.title(title)
-    plt.xlabel("n")
-    plt.ylabel("Time (s)")
-    plt.grid(True, linestyle="--", alpha=0.5)
-    plt.tight_layout()
-    plt.savefig(os.path.join("figures", f"{name}.png"), dpi=200)
-    plt.close()
-
-
-def plot_comparison(all_results):
-    plt.figure(figsize=(8, 4.5))
+    ax.clear()
+    ax.plot(ns, ts, marker="o")
+    ax.set_title(title)
+    ax.set_xlabel("n")
+    ax.set_ylabel("Time (s)")
+    ax.grid(True, linestyle="--", alpha=0.5)
+    fig.tight_layout()
+    fig.savefig(os.path.join("figures", f"{name}.png"), dpi=200,
+                pil_kwargs={"compress_level": 1})
+
+
+def plot_comparison(fig, ax, all_results):
+    fig.set_size_inches(8, 4.5)
+    ax.clear()
     for name, title, rows in all_results:
         ns = [n for n, _ in rows]
         ts = [t for _, t in rows]
-        plt.plot(ns, ts, marker="o", label=title)
-    plt.yscale("log")
-    plt.title("Fibonacci Algorithm Comparison")
-    plt.xlabel("n")
-    plt.ylabel("Time (s, log scale)")
-    plt.grid(True, linestyle="--", alpha=0.5)
-    plt.legend()
-    plt.tight_layout()
-    plt.savefig(os.path.join("figures", "comparison.png"), dpi=200)
-    plt.close()
+        ax.plot(ns, ts, marker="o", label=title)
+    ax.set_yscale("log")
+    ax.set_title("Fibonacci Algorithm Comparison")
+    ax.set_xlabel("n")
+    ax.set_ylabel("Time (s, log scale)")
+    ax.grid(True, linestyle="--", alpha=0.5)
+    ax.legend()
+    fig.tight_layout()
+    fig.savefig(os.path.join("figures", "comparison.png"), dpi=200,
+                pil_kwargs={"compress_level": 1})
 
 
 def main():
+    args = parse_args()
+    if gmpy2 is None:
+        print("gmpy2 not available; skipping the GMP entries.")
+
     ensure_dirs()
+    build_dir = build_c_fib()
 
+    timings = iter(run_sweep(args.jobs, build_dir))
+    # one Figure is reused for every plot to skip repeated backend setup
+    fig, ax = plt.subplots(figsize=(7, 4))
     all_results = []
     for key, (title, fn) in ALGORITHMS.items():
         rows = []
         for n in INPUT_SIZES:
-            elapsed = time_run(fn, n)
+            elapsed = next(timings)
             rows.append((n, elapsed))
         write_csv(key, rows)
         write_table(key, rows)
-        plot_single(key, title, rows)
+        plot_single(fig, ax, key, title, rows)
         all_results.append((key, title, rows))
 
-    plot_comparison(all_results)
+    plot_comparison(fig, ax, all_results)
+    plt.close(fig)
 
 
 if __name__ == "__main__":
@@ -1,20 +1,34 @@
-import csv
+import argparse
+import multiprocessing
 import os
+import platform
 import random
-import sys
-import time
+import timeit
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
 
 import matplotlib
 
 matplotlib.use("Agg")
 import matplotlib.pyplot as plt
-
-sys.setrecursionlimit(500_000)
+import numpy as np
+
+# PyPy's tracing JIT already compiles the pure-Python loops, and Numba
+# does not run there
+if platform.python_implementation() == "PyPy":
+    njit = None
+else:
+    try:
+        from numba import njit
+    except ImportError:
+        njit = None
 
 SMALL_INPUTS = [100, 500, 1000, 2000, 5000, 10000]
 LARGE_INPUTS = [20000, 30000, 50000, 75000, 100000]
 INPUT_SIZES = SMALL_INPUTS + LARGE_INPUTS
-REPEATS = 3
+
+# input arrays for the current process, set by run_sweep or _init_worker
+_arrays = {}
 
 
 # --------------- algorithms ---------------
@@ -23,34 +37,52 @@ def quicksort(arr):
     if len(arr) <= 1:
         return arr
     pivot = arr[len(arr) // 2]
-    left = [x for x in arr if x < pivot]
-    middle = [x for x in arr if x == pivot]
-    right = [x for x in arr if x > pivot]
+    left, middle, right = [], [], []
+    for x in arr:
+        if x < pivot:
+            left.append(x)
+        elif x == pivot:
+            middle.append(x)
+        else:
+            right.append(x)
     return quicksort(left) + middle + quicksort(right)
 
 
 def merge_sort(arr):
-    if len(arr) <= 1:
-        return arr
-    mid = len(arr) // 2
-    left = merge_sort(arr[:mid])
-    right = merge_sort(arr[mid:])
-    return _merge(left, right)
-
-
-def _merge(left, right):
-    result = []
-    i = j = 0
-    while i < len(left) and j < len(right):
-        if left[i] <= right[j]:
-            result.append(left[i])
-            i += 1
-        else:
-            result.append(right[j])
-            j += 1
-    result.extend(left[i:])
-    result.extend(right[j:])
-    return result
+    # bottom-up: merge runs of doubling width between arr and one buffer
+    n = len(arr)
+    buf = [None] * n
+    width = 1
+    while width < n:
+        for lo in range(0, n, 2 * width):
+            _merge_into(arr, lo, min(lo + width, n), min(lo + 2 * width, n), buf)
+        arr, buf = buf, arr
+        width *= 2
+    return arr
+
+
+def _merge_into(src, lo, mid, hi, dst):
+    i, j, k = lo, mid, lo
+    if i < mid and j < hi:
+        x, y = src[i], src[j]
+        while True:
+            if x <= y:
+                dst[k] = x
+                i += 1
+                k += 1
+                if i == mid:
+                    break
+                x = src[i]
+            else:
+                dst[k] = y
+                j += 1
+                k += 1
+                if j == hi:
+                    break
+                y = src[j]
+    dst[k:k + mid - i] = src[i:mid]
+    k += mid - i
+    dst[k:k + hi - j] = src[j:hi]
 
 
 def _heapify(arr, n, i):
@@ -69,7 +101,6 @@ def _heapify(arr, n, i):
 
 
 def heapsort(arr):
-    arr = arr[:]
     n = len(arr)
     for i in range(n // 2 - 1, -1, -1):
         _heapify(arr, n, i)
@@ -80,7 +111,6 @@ def heapsort(arr):
 
 
 def shell_sort(arr):
-    arr = arr[:]
     n = len(arr)
     gap = n // 2
     while gap > 0:
@@ -95,6 +125,75 @@ def shell_sort(arr):
     return arr
 
 
+if njit is not None:
+    @njit(cache=True)
+    def _heapify_nb(arr, n, i):
+        while True:
+            largest = i
+            left = 2 * i + 1
+            right = 2 * i + 2
+            if left < n and arr[left] > arr[largest]:
+                largest = left
+            if right < n and arr[right] > arr[largest]:
+                largest = right
+            if largest == i:
+                break
+            arr[i], arr[largest] = arr[largest], arr[i]
+            i = largest
+
+    @njit(cache=True)
+    def _heapsort_nb(arr):
+        n = arr.shape[0]
+        for i in range(n // 2 - 1, -1, -1):
+            _heapify_nb(arr, n, i)
+        for i in range(n - 1, 0, -1):
+            arr[0], arr[i] = arr[i], arr[0]
+            _heapify_nb(arr, i, 0)
+
+    @njit(cache=True)
+    def _shell_sort_nb(arr):
+        n = arr.shape[0]
+        gap = n // 2
+        while gap > 0:
+            for i in range(gap, n):
+                temp = arr[i]
+                j = i
+                while j >= gap and arr[j - gap] > temp:
+                    arr[j] = arr[j - gap]
+                    j -= gap
+                arr[j] = temp
+            gap //= 2
+
+    # compile once at import so the timing loop never pays for it
+    _heapsort_nb(np.array([2, 1], dtype=np.int64))
+    _shell_sort_nb(np.array([2, 1], dtype=np.int64))
+
+
+def heapsort_nb(arr):
+    a = np.fromiter(arr, dtype=np.int64, count=len(arr))
+    _heapsort_nb(a)
+    return a.tolist()
+
+
+def shell_sort_nb(arr):
+    a = np.fromiter(arr, dtype=np.int64, count=len(arr))
+    _shell_sort_nb(a)
+    return a.tolist()
+
+
+def numpy_sort(arr):
+    a = np.fromiter(arr, dtype=np.int64, count=len(arr))
+    a.sort(kind="quicksort")
+    return a.tolist()
+
+
+def counting_sort(arr):
+    # inputs are non-negative ints bounded by 10 * n, so a single bincount
+    # pass replaces every comparison
+    counts = np.bincount(np.fromiter(arr, dtype=np.int64, count=len(arr)))
+    return np.repeat(np.arange(len(counts)), counts).tolist()
+
+
 # --------------- registry ---------------
 
 ALGORITHMS = {
@@ -102,8 +201,15 @@ ALGORITHMS = {
     "mergesort": ("MergeSort", merge_sort),
     "heapsort": ("HeapSort", heapsort),
     "shellsort": ("ShellSort", shell_sort),
+    "numpysort": ("NumPy Sort", numpy_sort),
+    "countingsort": ("CountingSort", counting_sort),
+    "timsort": ("Timsort (builtin)", sorted),
 }
 
+if njit is not None:
+    ALGORITHMS["heapsort_nb"] = ("HeapSort (Numba)", heapsort_nb)
+    ALGORITHMS["shellsort_nb"] = ("ShellSort (Numba)", shell_sort_nb)
+
 
 # --------------- helpers ---------------
 
@@ -112,15 +218,110 @@ def generate_random_array(n):
 
 
 def time_run(fn, arr):
-    best = None
-    for _ in range(REPEATS):
-        data = arr[:]
-        start = time.perf_counter()
-        fn(data)
-        elapsed = time.perf_counter() - start
-        if best is None or elapsed < best:
-            best = elapsed
-    return best
+    # heapsort and shell_sort sort in place, so every call refills one
+    # preallocated scratch list rather than allocating a fresh copy
+    scratch = [0] * len(arr)
+
+    def refill():
+        scratch[:] = arr
+
+    def run():
+        refill()
+        fn(scratch)
+
+    # the refill runs inside the timed call, so measure it on its own and
+    # subtract it; the baseline likewise copied outside the timed region
+    loops, total = timeit.Timer(refill).autorange()
+    refill_s = total / loops
+    loops, total = timeit.Timer(run).autorange()
+    return max(total / loops - refill_s, 0.0)
+
+
+def _available_cpus():
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def _pin_to_core(cpu):
+    if hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, {cpu})
+
+
+def _init_worker(cpus, shm_name, layout):
+    global _arrays
+    # attach to the parent's block by name and rebuild the lists once
+    shm = SharedMemory(name=shm_name)
+    total = sum(n for _, n in layout.values())
+    view = np.ndarray((total,), dtype=np.int64, buffer=shm.buf)
+    _arrays = {key: view[offset:offset + n].tolist() for key, (offset, n) in layout.items()}
+    del view
+    shm.close()
+    _pin_to_core(cpus.get())
+
+
+def _run_task(key, n):
+    return time_run(ALGORITHMS[key][1], _arrays[n])
+
+
+def _share_arrays(arrays):
+    layout = {}
+    offset = 0
+    for key, arr in arrays.items():
+        layout[key] = (offset, len(arr))
+        offset += len(arr)
+
+    shm = SharedMemory(create=True, size=max(offset, 1) * 8)
+    view = np.ndarray((offset,), dtype=np.int64, buffer=shm.buf)
+    for key, arr in arrays.items():
+        start, n = layout[key]
+        view[start:start + n] = arr
+    del view
+    return shm, layout
+
+
+def run_sweep(jobs, arrays):
+    global _arrays
+    tasks = [(key, n) for key in ALGORITHMS for n in INPUT_SIZES]
+    available = _available_cpus()
+    if jobs > len(available):
+        # workers sharing a CPU would time-share it while measuring
+        print(f"--jobs {jobs} exceeds the {len(available)} available CPUs; "
+              f"using {len(available)}.")
+        jobs = len(available)
+    if jobs <= 1:
+        _arrays = arrays
+        _pin_to_core(available[0])
+        for key, n in tasks:
+            yield _run_task(key, n)
+        return
+
+    cpus = multiprocessing.Queue()
+    for cpu in available[:jobs]:
+        cpus.put(cpu)
+
+    # workers read the arrays from one shared int64 block, so only its name
+    # and the offsets are pickled
+    shm, layout = _share_arrays(arrays)
+    try:
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker,
+                                 initargs=(cpus, shm.name, layout)) as pool:
+            # results are yielded in task order as they arrive, so main()
+            # can report progress during the sweep
+            yield from pool.map(_run_task, *zip(*tasks))
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Sorting Lab: empirical analysis")
+    parser.add_argument("--jobs", type=int, default=1,
+                        help="worker processes for the algorithm x input sweep, "
+                             "capped at the CPUs this process may run on; parallel "
+                             "timings share caches and memory bandwidth and are not "
+                             "comparable with serial ones")
+    return parser.parse_args()
 
 
 def ensure_dirs():
@@ -130,79 +331,87 @@ def ensure_dirs():
 
 def write_csv(name, rows):
     path = os.path.join("results", f"{name}.csv")
+    # same \r\n rows csv.writer produced, built up front and written once
+    lines = ["n,time_s", *(f"{n},{t}" for n, t in rows)]
     with open(path, "w", newline="") as handle:
-        writer = csv.writer(handle)
-        writer.writerow(["n", "time_s"])
-        writer.writerows(rows)
+        handle.write("\r\n".join(lines) + "\r\n")
 
 
 def write_table(name, rows):
     path = os.path.join("results", f"{name}_table.tex")
+    parts = [
+        "\\begin{table}[H]\n",
+        "\\centering\n",
+        "\\caption{" + name.replace("_", " ").title() + " Results}\n",
+        "\\begin{tabular}{rr}\n",
+        "\\toprule\n",
+        "n & time (s)\\\\\n",
+        "\\midrule\n",
+        *(f"{n} & {t:.6f}\\\\\n" for n, t in rows),
+        "\\bottomrule\n",
+        "\\end{tabular}\n",
+        "\\end{table}\n",
+    ]
     with open(path, "w") as handle:
-        handle.write("\\begin{table}[H]\n")
-        handle.write("\\centering\n")
-        handle.write("\\caption{" + name.replace("_", " ").title() + " Results}\n")
-        handle.write("\\begin{tabular}{rr}\n")
-        handle.write("\\toprule\n")
-        handle.write("n & time (s)\\\\\n")
-        handle.write("\\midrule\n")
-        for n, t in rows:
-            handle.write(f"{n} & {t:.6f}\\\\\n")
-        handle.write("\\bottomrule\n")
-        handle.write("\\end{tabular}\n")
-        handle.write("\\end{table}\n")
-
-
-def plot_single(name, title, rows):
+        handle.write("".join(parts))
+
+
+def plot_single(fig, ax, name, title, rows):
     ns = [n for n, _ in rows]
     ts = [t for _, t in rows]
-    plt.figure(figsize=(7, 4))
-    plt.plot(ns, ts, marker="o")
-    plt.title(title)
-    plt.xlabel("n (array size)")
-    plt.ylabel("Time (s)")
-    plt.grid(True, linestyle="--", alpha=0.5)
-    plt.tight_layout()
-    plt.savefig(os.path.join("figures", f"{name}.png"), dpi=200)
-    plt.close()
-
-
-def plot_comparison(all_results):
-    plt.figure(figsize=(8, 4.5))
+    ax.clear()
+    ax.plot(ns, ts, marker="o")
+    ax.set_title(title)
+    ax.set_xlabel("n (array size)")
+    ax.set_ylabel("Time (s)")
+    ax.grid(True, linestyle="--", alpha=0.5)
+    fig.tight_layout()
+    fig.savefig(os.path.join("figures", f"{name}.png"), dpi=200,
+                pil_kwargs={"compress_level": 1})
+
+
+def plot_comparison(fig, ax, all_results):
+    fig.set_size_inches(8, 4.5)
+    ax.clear()
     for name, title, rows in all_results:
         ns = [n for n, _ in rows]
         ts = [t for _, t in rows]
-        plt.plot(ns, ts, marker="o", label=title)
-    plt.title("Sorting Algorithm Comparison")
-    plt.xlabel("n (array size)")
-    plt.ylabel("Time (s)")
-    plt.grid(True, linestyle="--", alpha=0.5)
-    plt.legend()
-    plt.tight_layout()
-    plt.savefig(os.path.join("figures", "comparison.png"), dpi=200)
-    plt.close()
+        ax.plot(ns, ts, marker="o", label=title)
+    ax.set_title("Sorting Algorithm Comparison")
+    ax.set_xlabel("n (array size)")
+    ax.set_ylabel("Time (s)")
+    ax.grid(True, linestyle="--", alpha=0.5)
+    ax.legend()
+    fig.tight_layout()
+    fig.savefig(os.path.join("figures", "comparison.png"), dpi=200,
+                pil_kwargs={"compress_level": 1})
 
 
 def main():
+    args = parse_args()
     random.seed(42)
     ensure_dirs()
 
     # pre-generate arrays so every algorithm gets the same data
     arrays = {n: generate_random_array(n) for n in INPUT_SIZES}
 
+    timings = run_sweep(args.jobs, arrays)
+    # one Figure is reused for every plot to skip repeated backend setup
+    fig, ax = plt.subplots(figsize=(7, 4))
     all_results = []
     for key, (title, fn) in ALGORITHMS.items():
         rows = []
         for n in INPUT_SIZES:
-            elapsed = time_run(fn, arrays[n])
+            elapsed = next(timings)
             rows.append((n, elapsed))
             print(f"{title:>12s}  n={n:>7d}  t={elapsed:.6f}s")
         write_csv(key, rows)
         write_table(key, rows)
-        plot_single(key, title, rows)
+        plot_single(fig, ax, key, title, rows)
         all_results.append((key, title, rows))
 
-    plot_comparison(all_results)
+    plot_comparison(fig, ax, all_results)
+    plt.close(fig)
     print("Done.")
 
 